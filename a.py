@@ -1,35 +1,49 @@
+import io
+import json
+import os
+import pickle
+from pathlib import Path
+
 import pandas as pd
 
 # Load the Excel file
 file_path = r"C:\Users\Techcureindia\Downloads\Average MCAP_July2024ToDecember 2024.xlsx"
-xls = pd.ExcelFile(file_path)
-
-# Show available sheet names
-print("Available sheets:", xls.sheet_names)
-
-# Try to load the most likely sheet (adjust if needed)
-sheet_to_use = xls.sheet_names[0]  # Default to the first one, or change manually if needed
-
-# Load the sheet
-df_avg_mcap = pd.read_excel(xls, sheet_name=sheet_to_use)
-
-# Check which column has symbols
-print("Available columns:", df_avg_mcap.columns)
 
 # Assuming the column is named "Symbol" or similar — adjust if needed
 symbol_col = "Symbol"  # <- change this if your column name is different
 
-# Extract and format the symbols
-symbols = df_avg_mcap[symbol_col].dropna().astype(str).str.upper().str.strip()
-formatted_symbols = [f'"{symbol}.NS"' for symbol in symbols]
-
-# Now build the string with a newline after every 15 symbols
-lines = []
-for i in range(0, len(formatted_symbols), 15):
-    chunk = formatted_symbols[i:i+15]
-    lines.append(", ".join(chunk))
-
-all_nse_stocks = "all_nse_stocks = [\n    " + ",\n    ".join(lines) + "\n]"
-
-# Print preview
-print(all_nse_stocks)  # Preview the first 1000 characters of the result
+# Load only the symbol column from the first sheet (change sheet_name manually if needed).
+# The calamine engine parses the workbook in Rust, which is much faster than openpyxl.
+df_avg_mcap = pd.read_excel(file_path, sheet_name=0, engine="calamine", usecols=[symbol_col], dtype=str)
+
+# Extract the symbols
+symbols = df_avg_mcap[symbol_col].dropna().astype(str).str.strip().str.upper()
+
+# Write the list straight into one buffer, with a newline after every 15 symbols
+buf = io.StringIO()
+buf.write("all_nse_stocks = [\n    ")
+for count, symbol in enumerate(symbols):
+    if count and count % 15 == 0:
+        buf.write(",\n    ")
+    elif count:
+        buf.write(", ")
+    # json.dumps yields a valid, escaped Python string literal even for stray quotes/backslashes
+    buf.write(json.dumps(f"{symbol}.NS"))
+buf.write("\n]")
+
+all_nse_stocks = buf.getvalue()
+
+# Write the module (and a pickle for fast loading) next to this script, replacing atomically
+output_dir = Path(__file__).resolve().parent
+module_path = output_dir / "nse_stocks.py"
+pickle_path = output_dir / "nse_stocks.pkl"
+
+tmp_path = module_path.with_suffix(".py.tmp")
+tmp_path.write_text(all_nse_stocks + "\n", encoding="utf-8")
+os.replace(tmp_path, module_path)
+
+tmp_path = pickle_path.with_suffix(".pkl.tmp")
+tmp_path.write_bytes(pickle.dumps(tuple(f"{symbol}.NS" for symbol in symbols), protocol=pickle.HIGHEST_PROTOCOL))
+os.replace(tmp_path, pickle_path)
+
+print(f"Wrote {len(symbols)} symbols to {module_path} and {pickle_path}")
@@ -847,6 +847,10 @@ def create_ai_strategy_builder(screener):
         st.session_state.ai_explanation = None
     if 'ai_error' not in st.session_state:
         st.session_state.ai_error = None
+    if 'ai_warning' not in st.session_state:
+        st.session_state.ai_warning = None
+    if 'ai_document_results' not in st.session_state:
+        st.session_state.ai_document_results = []
     if 'ollama_client' not in st.session_state:
         st.session_state.ollama_client = None
     
@@ -857,8 +861,8 @@ def create_ai_strategy_builder(screener):
         with col1:
             available_models = []
             try:
-                temp_client = OllamaClient()
-                available_models = temp_client.get_available_models()
+                with OllamaClient() as temp_client:
+                    available_models = temp_client.get_available_models()
             except:
                 pass
             
@@ -949,6 +953,8 @@ def create_ai_strategy_builder(screener):
                 with st.spinner("🤖 AI is analyzing your request..."):
                     success, strategy, explanation, error = st.session_state.ollama_client.parse_strategy_from_nl(nl_input)
                     
+                    st.session_state.ai_document_results = []
+                    st.session_state.ai_warning = None
                     if success:
                         st.session_state.ai_generated_strategy = strategy
                         st.session_state.ai_explanation = explanation
@@ -988,30 +994,45 @@ def create_ai_strategy_builder(screener):
                 with st.expander("📄 Extracted Text Preview", expanded=False):
                     st.text_area("Document content:", document_text[:2000] + ("..." if len(document_text) > 2000 else ""), height=200, disabled=True)
                 
+                split_sections = st.checkbox(
+                    "Document contains several strategies separated by '---' lines",
+                    value=False,
+                    help="Each section is converted on its own. Leave unchecked for a single strategy."
+                )
+                
                 if st.button("🚀 Generate Strategy from Document", type="primary", use_container_width=True,
                              disabled=not st.session_state.ollama_client):
                     if not st.session_state.ollama_client:
                         st.error("Please connect to Ollama first!")
                     else:
                         with st.spinner("🤖 AI is analyzing the document..."):
-                            success, strategies, explanations, error = st.session_state.ollama_client.parse_strategy_from_document(document_text)
+                            success, strategies, explanations, error = st.session_state.ollama_client.parse_strategy_from_document(
+                                document_text, split_sections=split_sections
+                            )
                             
                             if success and strategies:
+                                # Add metadata
+                                for doc_strategy in strategies:
+                                    doc_strategy['_metadata'] = {
+                                        'created_at': datetime.now().isoformat(),
+                                        'source': 'document_upload',
+                                        'original_filename': uploaded_file.name,
+                                        'model_used': st.session_state.ollama_client.model
+                                    }
+                                
+                                st.session_state.ai_document_results = list(zip(strategies, explanations))
+                                st.session_state.pop('ai_document_choice', None)
                                 st.session_state.ai_generated_strategy = strategies[0]
                                 st.session_state.ai_explanation = explanations[0] if explanations else ""
                                 st.session_state.ai_error = None
-                                
-                                # Add metadata
-                                st.session_state.ai_generated_strategy['_metadata'] = {
-                                    'created_at': datetime.now().isoformat(),
-                                    'source': 'document_upload',
-                                    'original_filename': uploaded_file.name,
-                                    'model_used': st.session_state.ollama_client.model
-                                }
+                                # Sections that failed while others succeeded
+                                st.session_state.ai_warning = error or None
                             else:
+                                st.session_state.ai_document_results = []
                                 st.session_state.ai_generated_strategy = None
                                 st.session_state.ai_explanation = None
                                 st.session_state.ai_error = error
+                                st.session_state.ai_warning = None
                 
             except Exception as e:
                 st.error(f"Error processing document: {str(e)}")
@@ -1028,6 +1049,24 @@ def create_ai_strategy_builder(screener):
         st.error(f"❌ Error: {st.session_state.ai_error}")
         st.info("💡 Try rephrasing your request or check if Ollama is running.")
     
+    if st.session_state.ai_warning:
+        st.warning(f"⚠️ Some sections could not be converted: {st.session_state.ai_warning}")
+    
+    # Pick which of several strategies from a document to review
+    document_results = st.session_state.ai_document_results
+    if len(document_results) > 1:
+        def select_document_strategy():
+            index = st.session_state.ai_document_choice
+            st.session_state.ai_generated_strategy, st.session_state.ai_explanation = document_results[index]
+        
+        st.selectbox(
+            f"📑 {len(document_results)} strategies found in the document",
+            range(len(document_results)),
+            format_func=lambda i: f"{i + 1}. {document_results[i][0].get('name', 'Unnamed Strategy')}",
+            key="ai_document_choice",
+            on_change=select_document_strategy
+        )
+    
     # Display generated strategy
     if st.session_state.ai_generated_strategy:
         st.markdown("---")
@@ -6,70 +6,230 @@ Handles communication with local Ollama LLM for natural language to JSON strateg
 import json
 import re
 import os
+import asyncio
+import time
+import copy
+import hashlib
+import functools
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Generator
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from strategy_validator import StrategyValidator, validate_json_string
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    # json.loads also accepts bytes, just more slowly
+    _json_loads = json.loads
+
 
 # Load the system prompt
 PROMPT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts", "strategy_conversion_prompt.txt")
 
+# Markdown code fence around the LLM's JSON answer
+_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+
+# Something a strategy condition would mention: a number, a comparison sign or word
+_CONDITION_HINT_RE = re.compile(
+    r"\d|[<>=]|\b(?:above|below|over|under|greater|less|higher|lower|cross(?:es|ed)?|rising|falling)\b",
+    re.IGNORECASE,
+)
+
+# Upper bound on how much of an LLM reply is searched for JSON
+MAX_RESPONSE_SCAN_CHARS = 64 * 1024
+
+# Shared decoder for parsing LLM output (avoids building a decoder per call)
+_JSON_DECODER = json.JSONDecoder()
+
+# How long (seconds) a successful /api/tags lookup is reused before hitting Ollama again
+TAGS_CACHE_TTL = 30
+
+# base_url -> (fetched_at, model_names)
+_tags_cache: Dict[str, Tuple[float, List[str]]] = {}
+
+# Semantic response cache for parse_strategy_from_nl
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.92  # Cosine similarity needed to reuse a cached strategy
+SEMANTIC_CACHE_SIZE = 128  # Max cached strategies per client (least recently used are evicted)
+
+# Numbers (periods, thresholds) and comparison directions in a prompt; similar prompts only
+# share a result if these match, since embeddings barely separate 'RSI below 30' from
+# 'RSI below 35' or 'RSI above 30'
+_SIGNATURE_RE = re.compile(r"\d+(?:\.\d+)?|[<>]=?|==?|[a-z]+", re.IGNORECASE)
+_DIRECTION_WORDS = {
+    ">": ">", ">=": ">", "above": ">", "over": ">", "greater": ">", "higher": ">", "exceeds": ">",
+    "<": "<", "<=": "<", "below": "<", "under": "<", "less": "<", "lower": "<", "beneath": "<",
+    "=": "=", "==": "=", "equal": "=", "equals": "=",
+    "rising": "up", "increasing": "up", "falling": "down", "decreasing": "down",
+}
+
+# Persistent cache of raw LLM responses, survives process restarts
+DISK_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "indian_stock_screener", "ollama")
+DISK_CACHE_MAX_TEMPERATURE = 0.1  # Only near-deterministic generations are worth replaying
+
+# Token budget for JSON replies; a reply cut off at the budget (done_reason "length") is
+# retried once with the larger cap instead of failing as invalid JSON
+STRATEGY_MAX_TOKENS = 1024
+STRATEGY_RETRY_MAX_TOKENS = 4096
+
+
+@functools.lru_cache(maxsize=1)
+def _get_system_prompt() -> str:
+    """Load the system prompt from file (read once per process)."""
+    try:
+        with open(PROMPT_FILE, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        # Fallback minimal prompt if file not found
+        return """You are a stock strategy converter. Convert natural language to JSON format.
+Output only valid JSON with 'name', 'description', and 'conditions' fields."""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_disk_cache():
+    """Open the shared on-disk response cache. Returns None if diskcache is unavailable."""
+    try:
+        import diskcache
+        return diskcache.Cache(DISK_CACHE_DIR)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_embedder():
+    """Load the sentence embedding model once. Returns None if sentence-transformers is unavailable."""
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(EMBEDDING_MODEL)
+    except Exception:
+        return None
+
+
+def _prompt_signature(text: str) -> Tuple:
+    """The numbers and comparison directions in text, in order (e.g. 'RSI below 30' -> ('<', 30.0))."""
+    signature = []
+    for token in _SIGNATURE_RE.findall(text.lower()):
+        if token[0].isdigit():
+            signature.append(float(token))
+        elif token in _DIRECTION_WORDS:
+            signature.append(_DIRECTION_WORDS[token])
+    return tuple(signature)
+
+
+def _truncated_message(max_tokens: int) -> str:
+    """Error shown when a JSON reply still hits the token limit after the retry."""
+    return f"The model's reply was cut off after {max_tokens} tokens. Try describing fewer conditions."
+
+
+def _embed(text: str) -> Optional[np.ndarray]:
+    """Return a unit-length embedding for text, or None if no embedder is available."""
+    embedder = _get_embedder()
+    if embedder is None:
+        return None
+    return np.asarray(embedder.encode(text, normalize_embeddings=True), dtype=np.float32)
+
 
 class OllamaClient:
     """Client for interacting with Ollama local LLM."""
     
-    def __init__(self, model: str = "mistral:7b-instruct", base_url: str = "http://localhost:11434"):
+    def __init__(self, model: str = "mistral:7b-instruct", base_url: str = "http://localhost:11434",
+                 use_disk_cache: bool = True):
         """
         Initialize Ollama client.
         
         Args:
             model: The Ollama model to use (e.g., 'mistral:7b-instruct', 'llama2', 'codellama')
             base_url: Base URL for Ollama API (default: http://localhost:11434)
+            use_disk_cache: Replay identical strategy conversions that produced a valid strategy,
+                along with their explanation, from the on-disk cache
         """
         self.model = model
         self.base_url = base_url.rstrip("/")
-        self.system_prompt = self._load_system_prompt()
+        self.system_prompt = _get_system_prompt()
+        # Per instance: the validator keeps per-call state (errors, warnings, condition results)
         self.validator = StrategyValidator()
+        # sha256(auto_fix, prompt) -> (embedding_or_none, signature, strategy, explanation), in LRU order
+        self._cache: "OrderedDict[str, Tuple[Optional[np.ndarray], Tuple, Dict, str]]" = OrderedDict()
+        self.cache = _get_disk_cache() if use_disk_cache else None
+        self.cache_enabled = self.cache is not None
+        
+        # Reuse connections to Ollama instead of opening a new socket per request. Only failed
+        # connects are retried; a read timeout means Ollama is busy and must surface as Timeout.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                              max_retries=Retry(total=2, read=False, backoff_factor=0.1))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
-    def _load_system_prompt(self) -> str:
-        """Load the system prompt from file."""
-        try:
-            with open(PROMPT_FILE, 'r', encoding='utf-8') as f:
-                return f.read()
-        except FileNotFoundError:
-            # Fallback minimal prompt if file not found
-            return """You are a stock strategy converter. Convert natural language to JSON format.
-Output only valid JSON with 'name', 'description', and 'conditions' fields."""
+    def close(self):
+        """Close the underlying HTTP session."""
+        self.session.close()
     
-    def is_available(self) -> Tuple[bool, str]:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _fetch_tags(self, refresh: bool = False) -> Tuple[bool, List[str], str]:
         """
-        Check if Ollama is available and running.
+        Fetch the installed model names from /api/tags, reusing a recent result for this base_url.
+        
+        Args:
+            refresh: Ignore any cached result and query Ollama again
         
         Returns:
-            Tuple of (is_available, message)
+            Tuple of (ok, model_names, error_message)
         """
+        cached = _tags_cache.get(self.base_url)
+        if not refresh and cached and time.monotonic() - cached[0] < TAGS_CACHE_TTL:
+            return True, cached[1], ""
+        
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                model_names = [m.get("name", "") for m in models]
-                
-                # Check if our model is available
-                model_base = self.model.split(":")[0]
-                available = any(model_base in name for name in model_names)
-                
-                if available:
-                    return True, f"Connected to Ollama. Model '{self.model}' is available."
-                else:
-                    return False, f"Ollama is running but model '{self.model}' not found. Available: {model_names}"
-            else:
-                return False, f"Ollama returned status {response.status_code}"
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
+            if response.status_code != 200:
+                return False, [], f"Ollama returned status {response.status_code}"
+            models = response.json().get("models", [])
+            model_names = [m.get("name", "") for m in models]
+            _tags_cache[self.base_url] = (time.monotonic(), model_names)
+            return True, model_names, ""
         except requests.exceptions.ConnectionError:
-            return False, "Cannot connect to Ollama. Please ensure Ollama is running (ollama serve)."
+            return False, [], "Cannot connect to Ollama. Please ensure Ollama is running (ollama serve)."
         except requests.exceptions.Timeout:
-            return False, "Connection to Ollama timed out."
+            return False, [], "Connection to Ollama timed out."
         except Exception as e:
-            return False, f"Error checking Ollama: {str(e)}"
+            return False, [], f"Error checking Ollama: {str(e)}"
+    
+    def is_available(self) -> Tuple[bool, str]:
+        """
+        Check if Ollama is available and running.
+        
+        Returns:
+            Tuple of (is_available, message)
+        """
+        ok, model_names, error = self._fetch_tags()
+        if not ok:
+            return False, error
+        
+        # Check if our model is available
+        model_base = self.model.split(":")[0]
+        available = any(model_base in name for name in model_names)
+        
+        if not available:
+            # The cached list may predate a model that was just pulled or switched to
+            ok, model_names, error = self._fetch_tags(refresh=True)
+            if not ok:
+                return False, error
+            available = any(model_base in name for name in model_names)
+        
+        if available:
+            return True, f"Connected to Ollama. Model '{self.model}' is available."
+        else:
+            return False, f"Ollama is running but model '{self.model}' not found. Available: {model_names}"
     
     def warmup_model(self) -> Tuple[bool, str]:
         """
@@ -89,7 +249,7 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
                 }
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json=payload,
                 timeout=300  # 5 minute timeout for model loading
@@ -107,39 +267,55 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
     
     def get_available_models(self) -> List[str]:
         """Get list of available models from Ollama."""
-        try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                return [m.get("name", "") for m in models]
-        except:
-            pass
-        return []
+        return list(self._fetch_tags()[1])
+    
+    def _build_payload(self, user_prompt: str, temperature: float, system: Optional[str],
+                       max_tokens: int, json_mode: bool, stream: bool) -> Dict:
+        """Build the /api/generate request body shared by the sync, streaming and async paths."""
+        payload = {
+            "model": self.model,
+            "prompt": user_prompt,
+            "system": system or self.system_prompt,
+            "stream": stream,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,  # Max tokens to generate
+            }
+        }
+        if json_mode:
+            # Constrain decoding to valid JSON so the model stops as soon as the object is closed
+            payload["format"] = "json"
+        return payload
+    
+    def _disk_cache_key(self, payload: Dict) -> Optional[str]:
+        """Key for a request in the on-disk cache, or None if the request should not be cached."""
+        if not self.cache_enabled or payload["options"]["temperature"] > DISK_CACHE_MAX_TEMPERATURE:
+            return None
+        key_fields = (
+            payload["model"], payload["system"], payload["prompt"], payload["options"]["temperature"],
+            payload["options"]["num_predict"], payload.get("format"),
+        )
+        return hashlib.blake2b(json.dumps(key_fields).encode("utf-8"), digest_size=32).hexdigest()
     
-    def generate(self, user_prompt: str, temperature: float = 0.1) -> Tuple[bool, str, str]:
+    def generate(self, user_prompt: str, temperature: float = 0.1, system: Optional[str] = None,
+                 max_tokens: int = STRATEGY_MAX_TOKENS, json_mode: bool = True) -> Tuple[bool, str, str]:
         """
         Generate a response from the LLM.
         
         Args:
             user_prompt: The user's natural language input
             temperature: LLM temperature (lower = more deterministic)
+            system: System prompt override (defaults to the strategy conversion prompt)
+            max_tokens: Maximum number of tokens to generate
+            json_mode: Ask Ollama to constrain the output to JSON
         
         Returns:
             Tuple of (success, response_text, error_message)
         """
         try:
-            payload = {
-                "model": self.model,
-                "prompt": user_prompt,
-                "system": self.system_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": temperature,
-                    "num_predict": 2048,  # Max tokens to generate
-                }
-            }
+            payload = self._build_payload(user_prompt, temperature, system, max_tokens, json_mode, stream=False)
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json=payload,
                 timeout=300  # 5 minute timeout for generation (model may need to load)
@@ -148,6 +324,10 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
             if response.status_code == 200:
                 result = response.json()
                 generated_text = result.get("response", "")
+                if json_mode and result.get("done_reason") == "length":
+                    if max_tokens < STRATEGY_RETRY_MAX_TOKENS:
+                        return self.generate(user_prompt, temperature, system, STRATEGY_RETRY_MAX_TOKENS, json_mode)
+                    return False, "", _truncated_message(max_tokens)
                 return True, generated_text, ""
             else:
                 return False, "", f"Ollama error: {response.status_code} - {response.text}"
@@ -159,7 +339,8 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
         except Exception as e:
             return False, "", f"Error generating response: {str(e)}"
     
-    def generate_stream(self, user_prompt: str, temperature: float = 0.1) -> Generator[str, None, None]:
+    def generate_stream(self, user_prompt: str, temperature: float = 0.1, max_tokens: int = STRATEGY_MAX_TOKENS,
+                        json_mode: bool = True) -> Generator[str, None, None]:
         """
         Generate a streaming response from the LLM.
         
@@ -167,37 +348,101 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
             Chunks of generated text
         """
         try:
-            payload = {
-                "model": self.model,
-                "prompt": user_prompt,
-                "system": self.system_prompt,
-                "stream": True,
-                "options": {
-                    "temperature": temperature,
-                    "num_predict": 2048,
-                }
-            }
-            
-            with requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                stream=True,
-                timeout=300  # 5 minute timeout
-            ) as response:
-                if response.status_code == 200:
-                    for line in response.iter_lines():
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                chunk = data.get("response", "")
-                                if chunk:
-                                    yield chunk
-                            except json.JSONDecodeError:
-                                continue
-                                
+            payload = self._build_payload(user_prompt, temperature, None, max_tokens, json_mode, stream=True)
+            yield from self._iter_stream(payload)
         except Exception as e:
             yield f"[Error: {str(e)}]"
     
+    def _iter_stream(self, payload: Dict, status: Optional[Dict] = None) -> Generator[str, None, None]:
+        """
+        Yield text chunks from a streaming /api/generate request.
+        Closing the generator early closes the connection, which stops generation in Ollama.
+        If status is given, the final message's 'done_reason' is stored in it.
+        
+        Raises:
+            RuntimeError: If Ollama returns a non-200 status
+        """
+        with self.session.post(
+            f"{self.base_url}/api/generate",
+            json=payload,
+            stream=True,
+            timeout=300  # 5 minute timeout
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Ollama error: {response.status_code} - {response.text}")
+            
+            # Parse the raw NDJSON bytes; skip keep-alives and lines without a token
+            for line in response.iter_lines(decode_unicode=False):
+                if not line or b'"response"' not in line:
+                    continue
+                try:
+                    message = _json_loads(line)
+                except ValueError:
+                    continue
+                chunk = message.get("response", "")
+                if chunk:
+                    yield chunk
+                if status is not None and message.get("done"):
+                    status["done_reason"] = message.get("done_reason")
+    
+    def _strategy_payload(self, user_prompt: str, max_tokens: int = STRATEGY_MAX_TOKENS) -> Dict:
+        """Streaming request used to convert a strategy description to JSON."""
+        return self._build_payload(user_prompt, 0.1, None, max_tokens, True, stream=True)
+    
+    def _generate_json_streamed(self, user_prompt: str, max_tokens: int = STRATEGY_MAX_TOKENS) -> Tuple[bool, str, str]:
+        """
+        Stream a JSON response and stop as soon as the first complete object has arrived,
+        instead of waiting for the model to finish generating trailing tokens.
+        A reply cut off by the token limit is retried once with STRATEGY_RETRY_MAX_TOKENS.
+        
+        Returns:
+            Tuple of (success, response_text, error_message)
+        """
+        status: Dict = {}
+        chunks = self._iter_stream(self._strategy_payload(user_prompt, max_tokens), status)
+        text = ""
+        start = -1
+        depth = 0
+        
+        try:
+            for chunk in chunks:
+                text += chunk
+                
+                # Track brace depth with one counter; string contents can throw it off,
+                # which is fine because raw_decode below has the final say
+                if start == -1:
+                    start = text.find('{')
+                    if start == -1:
+                        continue
+                    depth = text.count('{', start) - text.count('}', start)
+                else:
+                    depth += chunk.count('{') - chunk.count('}')
+                
+                if depth <= 0:
+                    try:
+                        _, end = _JSON_DECODER.raw_decode(text, start)
+                    except json.JSONDecodeError:
+                        continue
+                    text = text[start:end]
+                    break
+            else:
+                # The stream ended without a complete object
+                if status.get("done_reason") == "length":
+                    if max_tokens < STRATEGY_RETRY_MAX_TOKENS:
+                        chunks.close()
+                        return self._generate_json_streamed(user_prompt, STRATEGY_RETRY_MAX_TOKENS)
+                    return False, "", _truncated_message(max_tokens)
+            
+            return True, text, ""
+        except requests.exceptions.Timeout:
+            return False, "", "Request timed out. The model might be loading or the query is too complex."
+        except requests.exceptions.ConnectionError:
+            return False, "", "Cannot connect to Ollama. Please ensure it's running."
+        except Exception as e:
+            return False, "", f"Error generating response: {str(e)}"
+        finally:
+            chunks.close()
+    
     def _extract_json(self, text: str) -> Optional[str]:
         """
         Extract JSON from LLM response, handling markdown code blocks.
@@ -208,37 +453,65 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
         Returns:
             Extracted JSON string or None
         """
+        # Replies longer than this are malformed anyway; don't scan all of them
+        text = text[:MAX_RESPONSE_SCAN_CHARS]
+        
+        # Plain prose with no object and no code block: nothing to extract
+        has_fence = "```" in text
+        if "{" not in text and not has_fence:
+            return None
+        
         # Remove any leading/trailing whitespace
         text = text.strip()
         
         # Try to find JSON in markdown code blocks
         # Pattern 1: ```json ... ```
-        json_block = re.search(r'```(?:json)?\s*(.*?)```', text, re.DOTALL)
-        if json_block:
-            return json_block.group(1).strip()
+        if has_fence:
+            json_block = _FENCE_RE.search(text)
+            if json_block:
+                return json_block.group(1).strip()
         
         # Pattern 2: Just find the JSON object directly
-        # Find the first { and last matching }
+        # Let the C JSON scanner find where the first object ends
         start = text.find('{')
         if start != -1:
-            # Count braces to find matching end
-            depth = 0
-            end = start
-            for i, char in enumerate(text[start:], start):
-                if char == '{':
-                    depth += 1
-                elif char == '}':
-                    depth -= 1
-                    if depth == 0:
-                        end = i + 1
-                        break
-            
-            if end > start:
+            try:
+                _, end = _JSON_DECODER.raw_decode(text, start)
                 return text[start:end]
+            except json.JSONDecodeError:
+                pass
         
         # If nothing found, return the whole text
         return text
     
+    def _cache_lookup(self, key: str, embedding: Optional[np.ndarray],
+                      signature: Tuple) -> Optional[Tuple[Optional[np.ndarray], Tuple, Dict, str]]:
+        """
+        Find a cached result by exact key, falling back to cosine similarity among entries
+        with the same signature (see _prompt_signature).
+        """
+        entry = self._cache.get(key)
+        if entry is None and embedding is not None:
+            keys = [k for k, e in self._cache.items() if e[0] is not None and e[1] == signature]
+            if keys:
+                scores = np.stack([self._cache[k][0] for k in keys]) @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] > SEMANTIC_CACHE_THRESHOLD:
+                    key = keys[best]
+                    entry = self._cache[key]
+        
+        if entry is not None:
+            self._cache.move_to_end(key)
+        return entry
+    
+    def _cache_store(self, key: str, embedding: Optional[np.ndarray], signature: Tuple,
+                     strategy: Dict, explanation: str):
+        """Remember a successful conversion, evicting the least recently used entry when full."""
+        self._cache[key] = (embedding, signature, copy.deepcopy(strategy), explanation)
+        self._cache.move_to_end(key)
+        while len(self._cache) > SEMANTIC_CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
     def parse_strategy_from_nl(self, natural_language: str, auto_fix: bool = True) -> Tuple[bool, Optional[Dict], str, str]:
         """
         Convert natural language description to a strategy JSON.
@@ -250,55 +523,184 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
         Returns:
             Tuple of (success, strategy_dict, ai_explanation, error_message)
         """
-        # Generate the strategy
-        success, response, error = self.generate(natural_language)
-        
-        if not success:
+        # Serve repeated or paraphrased requests from the cache. auto_fix is part of the key
+        # and signature: a strategy that was only valid after sanitizing must not be
+        # returned to an auto_fix=False caller.
+        cache_key = hashlib.sha256(f"{auto_fix}\0{natural_language}".encode("utf-8")).hexdigest()
+        signature = (auto_fix,) + _prompt_signature(natural_language)
+        embedding = None
+        # Nothing to compare against on the first request, so don't load the embedding model yet
+        if self._cache and cache_key not in self._cache:
+            embedding = _embed(natural_language)
+        cached = self._cache_lookup(cache_key, embedding, signature)
+        if cached is not None:
+            return True, copy.deepcopy(cached[2]), cached[3], ""
+        
+        # Replay a previous reply and its explanation from disk, skipping Ollama entirely
+        disk_key = self._disk_cache_key(self._strategy_payload(natural_language))
+        replay = self.cache.get(disk_key) if disk_key is not None else None
+        if isinstance(replay, tuple):
+            response, explanation = replay
+        else:
+            # Generate the strategy, stopping the stream once a complete JSON object is received
+            success, response, error = self._generate_json_streamed(natural_language)
+            if not success:
+                return False, None, "", error
+            explanation = None
+        
+        strategy, error = self._strategy_from_response(response, auto_fix)
+        if strategy is None:
             return False, None, "", error
         
+        if explanation is None:
+            explanation = self._llm_explanation(strategy)
+            # Persist only replies that parsed and validated, so a bad sample can be retried
+            if explanation is not None and disk_key is not None:
+                self.cache.set(disk_key, (response, explanation))
+            explanation = explanation or self._basic_explanation(strategy)
+        
+        if embedding is None:
+            # Skipped during lookup; needed so rewordings of this prompt can hit later
+            embedding = _embed(natural_language)
+        self._cache_store(cache_key, embedding, signature, strategy, explanation)
+        
+        return True, strategy, explanation, ""
+    
+    def _strategy_from_response(self, response: str, auto_fix: bool = True) -> Tuple[Optional[Dict], str]:
+        """
+        Extract, parse and validate a strategy from a raw LLM response.
+        
+        Returns:
+            Tuple of (strategy_dict_or_none, error_message)
+        """
         # Extract JSON from response
         json_str = self._extract_json(response)
         
         if not json_str:
-            return False, None, "", "Could not extract JSON from LLM response"
+            return None, "Could not extract JSON from LLM response"
         
         # Parse and validate
         try:
-            strategy = json.loads(json_str)
+            strategy = _JSON_DECODER.decode(json_str)
         except json.JSONDecodeError as e:
-            return False, None, "", f"Invalid JSON from LLM: {str(e)}"
+            return None, f"Invalid JSON from LLM: {str(e)}"
         
         # Validate
         is_valid, errors, warnings = self.validator.validate_strategy(strategy)
         
         if not is_valid:
             if auto_fix:
-                # Try to sanitize/fix
-                strategy = self.validator.sanitize_strategy(strategy)
-                is_valid, errors, warnings = self.validator.validate_strategy(strategy)
+                # Try to sanitize/fix, then re-check only the conditions that changed
+                strategy, changed = self.validator.sanitize_strategy(strategy)
+                is_valid, errors, warnings = self.validator.validate_strategy(strategy, only=changed)
                 
                 if not is_valid:
-                    return False, None, "", f"Could not fix strategy: {'; '.join(errors)}"
+                    return None, f"Could not fix strategy: {'; '.join(errors)}"
             else:
-                return False, None, "", f"Invalid strategy: {'; '.join(errors)}"
+                return None, f"Invalid strategy: {'; '.join(errors)}"
         
-        # Generate explanation
-        explanation = self._generate_explanation(strategy)
+        return strategy, ""
+    
+    async def _agenerate(self, client, user_prompt: str, temperature: float = 0.1, system: Optional[str] = None,
+                         max_tokens: int = STRATEGY_MAX_TOKENS, json_mode: bool = True) -> Tuple[bool, str, str]:
+        """
+        Async counterpart of generate() used to overlap several requests.
         
-        return True, strategy, explanation, ""
+        Args:
+            client: An open httpx.AsyncClient
+            user_prompt: The prompt to send
+            temperature: LLM temperature
+            system: System prompt override (defaults to the strategy conversion prompt)
+            max_tokens: Maximum number of tokens to generate
+            json_mode: Ask Ollama to constrain the output to JSON
+        
+        Returns:
+            Tuple of (success, response_text, error_message)
+        """
+        payload = self._build_payload(user_prompt, temperature, system, max_tokens, json_mode, stream=False)
+        try:
+            response = await client.post(f"{self.base_url}/api/generate", json=payload)
+            if response.status_code == 200:
+                result = response.json()
+                if json_mode and result.get("done_reason") == "length":
+                    if max_tokens < STRATEGY_RETRY_MAX_TOKENS:
+                        return await self._agenerate(client, user_prompt, temperature, system,
+                                                     STRATEGY_RETRY_MAX_TOKENS, json_mode)
+                    return False, "", _truncated_message(max_tokens)
+                return True, result.get("response", ""), ""
+            return False, "", f"Ollama error: {response.status_code} - {response.text}"
+        except Exception as e:
+            return False, "", f"Error generating response: {str(e)}"
+    
+    async def _aparse_sections(self, sections: List[str]) -> List[Tuple[Optional[Dict], str, str]]:
+        """Convert several strategy descriptions concurrently. Returns (strategy, explanation, error) per section."""
+        import httpx
+        
+        async with httpx.AsyncClient(timeout=300) as client:
+            generated = await asyncio.gather(*[self._agenerate(client, section) for section in sections])
+            
+            results = []
+            for success, response, error in generated:
+                if not success:
+                    results.append((None, "", error))
+                    continue
+                strategy, error = self._strategy_from_response(response)
+                results.append((strategy, "", error))
+            
+            # Explanations for all valid strategies are requested together as well
+            valid = [i for i, (strategy, _, _) in enumerate(results) if strategy is not None]
+            explained = await asyncio.gather(*[
+                self._agenerate(
+                    client, self._explanation_prompt(results[i][0]),
+                    temperature=0.3, max_tokens=400, json_mode=False
+                )
+                for i in valid
+            ])
+            for i, (success, response, _) in zip(valid, explained):
+                strategy = results[i][0]
+                results[i] = (strategy, response.strip() if success else self._basic_explanation(strategy), "")
+        
+        return results
     
-    def parse_strategy_from_document(self, document_text: str) -> Tuple[bool, List[Dict], List[str], str]:
+    def parse_strategy_from_document(self, document_text: str,
+                                     split_sections: bool = False) -> Tuple[bool, List[Dict], List[str], str]:
         """
         Parse one or more strategies from a document.
         
+        By default the whole document is converted as one strategy. With split_sections, a
+        document holding several strategies separated by '---' rules is converted section by
+        section, concurrently so Ollama can batch them; start Ollama with OLLAMA_NUM_PARALLEL
+        set to the expected number of strategies to benefit.
+        
         Args:
             document_text: Full text content of the document
+            split_sections: Treat '---' separated sections as independent strategies
         
         Returns:
-            Tuple of (success, list_of_strategies, list_of_explanations, error_message)
+            Tuple of (success, list_of_strategies, list_of_explanations, error_message).
+            With split_sections, error_message can be set on success and lists the
+            sections that failed.
         """
-        # For now, treat the whole document as one strategy description
-        # Future enhancement: split into sections and parse each
+        sections = _split_document_sections(document_text) if split_sections else [document_text]
+        
+        if len(sections) > 1:
+            results = None
+            if not _event_loop_running():
+                try:
+                    results = asyncio.run(self._aparse_sections(sections))
+                except ImportError:
+                    pass
+            if results is None:
+                # httpx not installed or already inside an event loop - convert the sections one after another
+                results = [self.parse_strategy_from_nl(section)[1:] for section in sections]
+            
+            strategies = [r[0] for r in results if r[0] is not None]
+            explanations = [r[1] for r in results if r[0] is not None]
+            errors = [f"Section {i}: {r[2]}" for i, r in enumerate(results, 1) if r[0] is None]
+            
+            if strategies:
+                return True, strategies, explanations, "; ".join(errors)
+            return False, [], [], "; ".join(errors)
         
         success, strategy, explanation, error = self.parse_strategy_from_nl(document_text)
         
@@ -307,6 +709,20 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
         else:
             return False, [], [], error
     
+    def _explanation_prompt(self, strategy: Dict) -> str:
+        """
+        Build the user prompt asking the LLM to explain a strategy.
+        The request is sent with the same system prompt as the conversion so Ollama keeps
+        serving that long prefix from its KV-cache; the instructions live here instead.
+        """
+        return f"""Explain this trading strategy in plain English for a beginner investor. 
+Be concise but thorough. Explain what each condition looks for and why it might be useful.
+
+Strategy JSON:
+{json.dumps(strategy, indent=2)}
+
+Provide a clear, numbered explanation of each condition and an overall summary of what this strategy is trying to find."""
+    
     def _generate_explanation(self, strategy: Dict) -> str:
         """
         Generate a plain English explanation of the strategy.
@@ -317,46 +733,27 @@ Output only valid JSON with 'name', 'description', and 'conditions' fields."""
         Returns:
             Plain English explanation
         """
-        explanation_prompt = f"""Explain this trading strategy in plain English for a beginner investor. 
-Be concise but thorough. Explain what each condition looks for and why it might be useful.
-
-Strategy JSON:
-{json.dumps(strategy, indent=2)}
-
-Provide a clear, numbered explanation of each condition and an overall summary of what this strategy is trying to find."""
-
-        success, response, error = self.generate(explanation_prompt, temperature=0.3)
-        
-        if success:
-            return response.strip()
-        else:
-            # Fallback to basic explanation
-            return self._basic_explanation(strategy)
+        # Fallback to basic explanation
+        return self._llm_explanation(strategy) or self._basic_explanation(strategy)
+    
+    def _llm_explanation(self, strategy: Dict) -> Optional[str]:
+        """Ask the LLM to explain a strategy. Returns None if generation failed."""
+        success, response, error = self.generate(
+            self._explanation_prompt(strategy), temperature=0.3, max_tokens=400, json_mode=False
+        )
+        return response.strip() if success else None
     
     def _basic_explanation(self, strategy: Dict) -> str:
         """Generate a basic explanation without LLM."""
-        lines = [f"**{strategy.get('name', 'Strategy')}**\n"]
-        lines.append(strategy.get('description', 'No description provided.'))
-        lines.append("\n**Conditions:**")
-        
-        for i, cond in enumerate(strategy.get('conditions', []), 1):
-            lhs = cond.get('lhs', {})
-            rhs = cond.get('rhs', {})
-            op = cond.get('operator', '?')
-            
-            lhs_name = lhs.get('name', 'unknown')
-            lhs_tf = lhs.get('timeframe', 'daily')
-            
-            if rhs.get('type') == 'value':
-                rhs_str = str(rhs.get('value', '?'))
-            else:
-                rhs_name = rhs.get('name', 'unknown')
-                rhs_tf = rhs.get('timeframe', 'daily')
-                rhs_str = f"{rhs_tf} {rhs_name}"
-            
-            lines.append(f"{i}. {lhs_tf.capitalize()} {lhs_name} {op} {rhs_str}")
+        header = f"**{strategy.get('name', 'Strategy')}**\n"
+        description = strategy.get('description', 'No description provided.')
+        
+        parts = (
+            f"{i}. {_lhs_str(cond.get('lhs', {}))} {cond.get('operator', '?')} {_rhs_str(cond.get('rhs', {}))}"
+            for i, cond in enumerate(strategy.get('conditions', []), 1)
+        )
         
-        return "\n".join(lines)
+        return "\n".join((header, description, "\n**Conditions:**", *parts))
     
     def generate_strategy_explanation(self, strategy: Dict) -> str:
         """
@@ -371,24 +768,80 @@ Provide a clear, numbered explanation of each condition and an overall summary o
         return self._generate_explanation(strategy)
 
 
+def _lhs_str(lhs: Dict) -> str:
+    """Describe the left-hand side of a condition, e.g. 'Daily rsi'."""
+    return f"{lhs.get('timeframe', 'daily').capitalize()} {lhs.get('name', 'unknown')}"
+
+
+def _rhs_str(rhs: Dict) -> str:
+    """Describe the right-hand side of a condition, e.g. '30' or 'daily sma'."""
+    if rhs.get('type') == 'value':
+        return str(rhs.get('value', '?'))
+    return f"{rhs.get('timeframe', 'daily')} {rhs.get('name', 'unknown')}"
+
+
+def _event_loop_running() -> bool:
+    """Whether this thread is already running an asyncio event loop (asyncio.run would fail)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _split_document_sections(document_text: str) -> List[str]:
+    """
+    Split a document into strategy sections on '---' rules.
+    
+    Headings are not treated as boundaries since a single strategy often has subsections
+    (e.g. separate volume and trend filters) that must be converted together. A rule only
+    separates sections when it follows a blank line; directly under text it is a setext
+    heading underline. Sections without anything that looks like a condition (titles,
+    notes) are dropped, and unless at least two sections remain the whole document is
+    returned as a single section.
+    """
+    sections: List[List[str]] = [[]]
+    previous = ""
+    for line in document_text.splitlines():
+        stripped = line.strip()
+        if len(stripped) >= 3 and set(stripped) == {"-"} and not previous:
+            if sections[-1]:
+                sections.append([])
+        else:
+            sections[-1].append(line)
+        previous = stripped
+    
+    texts = ["\n".join(lines).strip() for lines in sections]
+    strategies = [text for text in texts if _CONDITION_HINT_RE.search(text)]
+    return strategies if len(strategies) > 1 else [document_text]
+
+
 def extract_text_from_pdf(file_path: str) -> str:
     """Extract text from a PDF file."""
     try:
-        import PyPDF2
-        text = []
-        with open(file_path, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                text.append(page.extract_text())
-        return "\n".join(text)
+        import pypdfium2 as pdfium
+        doc = pdfium.PdfDocument(file_path)
+        try:
+            return "\n".join(page.get_textpage().get_text_range() for page in doc)
+        finally:
+            doc.close()
     except ImportError:
-        raise ImportError("PyPDF2 is required for PDF support. Install with: pip install PyPDF2")
+        raise ImportError("pypdfium2 is required for PDF support. Install with: pip install pypdfium2")
     except Exception as e:
         raise Exception(f"Error reading PDF: {str(e)}")
 
 
 def extract_text_from_docx(file_path: str) -> str:
     """Extract text from a DOCX file."""
+    try:
+        import docx2txt
+        return docx2txt.process(file_path)
+    except ImportError:
+        pass
+    except Exception as e:
+        raise Exception(f"Error reading DOCX: {str(e)}")
+    
+    # Fall back to python-docx when docx2txt is not installed
     try:
         from docx import Document
         doc = Document(file_path)
@@ -397,7 +850,7 @@ def extract_text_from_docx(file_path: str) -> str:
             text.append(paragraph.text)
         return "\n".join(text)
     except ImportError:
-        raise ImportError("python-docx is required for DOCX support. Install with: pip install python-docx")
+        raise ImportError("docx2txt or python-docx is required for DOCX support. Install with: pip install docx2txt")
     except Exception as e:
         raise Exception(f"Error reading DOCX: {str(e)}")
 
@@ -3,46 +3,471 @@ Strategy Validator Module
 Validates and sanitizes AI-generated strategy JSON to ensure compatibility with the stock screener.
 """
 
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Any, Set
+from collections import namedtuple
+from functools import lru_cache
 import json
+import sys
 
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
+
+# Per-indicator settings; a namedtuple so readers use attribute access instead of dict subscripts
+IndicatorSpec = namedtuple("IndicatorSpec", "requires_period default_period")
 
 # Valid indicator definitions
 VALID_INDICATORS = {
     # Price/Volume (no period required)
-    "close": {"requires_period": False},
-    "open": {"requires_period": False},
-    "high": {"requires_period": False},
-    "low": {"requires_period": False},
-    "volume": {"requires_period": False},
-    "volume_turnover": {"requires_period": False},
+    "close": IndicatorSpec(False, None),
+    "open": IndicatorSpec(False, None),
+    "high": IndicatorSpec(False, None),
+    "low": IndicatorSpec(False, None),
+    "volume": IndicatorSpec(False, None),
+    "volume_turnover": IndicatorSpec(False, None),
     
     # Moving Averages (period required)
-    "sma": {"requires_period": True, "default_period": 20},
-    "ema": {"requires_period": True, "default_period": 20},
-    "wma": {"requires_period": True, "default_period": 20},
-    "hma": {"requires_period": True, "default_period": 20},
-    "vwma": {"requires_period": True, "default_period": 20},
+    "sma": IndicatorSpec(True, 20),
+    "ema": IndicatorSpec(True, 20),
+    "wma": IndicatorSpec(True, 20),
+    "hma": IndicatorSpec(True, 20),
+    "vwma": IndicatorSpec(True, 20),
     
     # Momentum (period required)
-    "rsi": {"requires_period": True, "default_period": 14},
-    "macd": {"requires_period": True, "default_period": 12},
-    "macd_signal": {"requires_period": True, "default_period": 9},
-    "adx": {"requires_period": True, "default_period": 14},
+    "rsi": IndicatorSpec(True, 14),
+    "macd": IndicatorSpec(True, 12),
+    "macd_signal": IndicatorSpec(True, 9),
+    "adx": IndicatorSpec(True, 14),
     
     # Volatility (period required)
-    "atr": {"requires_period": True, "default_period": 14},
-    "atr_ratio": {"requires_period": True, "default_period": 14},
-    "bb_high": {"requires_period": True, "default_period": 20},
-    "bb_mid": {"requires_period": True, "default_period": 20},
-    "bb_low": {"requires_period": True, "default_period": 20},
+    "atr": IndicatorSpec(True, 14),
+    "atr_ratio": IndicatorSpec(True, 14),
+    "bb_high": IndicatorSpec(True, 20),
+    "bb_mid": IndicatorSpec(True, 20),
+    "bb_low": IndicatorSpec(True, 20),
     
     # Volume indicators
-    "volume_sma": {"requires_period": True, "default_period": 20},
+    "volume_sma": IndicatorSpec(True, 20),
+}
+
+# Ordered tuples for messages, frozensets for membership tests
+# (interned, so matching keys compare by identity before falling back to a full string compare)
+_OPERATOR_LIST = tuple(map(sys.intern, (">", "<", ">=", "<=", "==", "≈ (approx)")))
+_TIMEFRAME_LIST = tuple(map(sys.intern, ("daily", "weekly", "monthly")))
+VALID_OPERATORS = frozenset(_OPERATOR_LIST)
+VALID_TIMEFRAMES = frozenset(_TIMEFRAME_LIST)
+
+# Flattened views of VALID_INDICATORS for the validation hot path
+_VALID_INDICATOR_NAMES = frozenset(VALID_INDICATORS)
+_REQUIRES_PERIOD = frozenset(k for k, v in VALID_INDICATORS.items() if v.requires_period)
+_DEFAULT_PERIOD = {k: v.default_period for k, v in VALID_INDICATORS.items()}
+_VALID_INDICATOR_LIST = tuple(VALID_INDICATORS)
+_CANONICAL_INDICATOR_NAMES = {k: k for k in VALID_INDICATORS}
+
+# Preformatted lists for error messages
+_VALID_INDICATOR_NAMES_STR = ", ".join(_VALID_INDICATOR_LIST)
+_VALID_OPERATORS_STR = ", ".join(_OPERATOR_LIST)
+_VALID_TIMEFRAMES_STR = ", ".join(_TIMEFRAME_LIST)
+
+
+ERROR = "error"
+WARNING = "warning"
+
+# A (severity, message) pair produced by the _iter_*_problems generators
+Problem = Tuple[str, str]
+
+# Shared results for the success path and the fixed-message leaf errors
+_OK: Tuple[bool, str] = (True, "")
+_BAD_TYPE: Problem = (ERROR, "Operand must be an object")
+_MISSING_TYPE: Problem = (ERROR, "Missing 'type' field")
+_MISSING_NAME: Problem = (ERROR, "Missing 'name' field")
+_BAD_OFFSET: Problem = (ERROR, "'offset' must be a non-negative integer")
+_MISSING_VALUE: Problem = (ERROR, "Value type missing 'value' field")
+_BAD_VALUE: Problem = (ERROR, "'value' must be a number")
+
+
+def _iter_indicator_problems(indicator: Dict, side: str) -> Iterator[Problem]:
+    """Yield problems for an indicator operand, stopping after the first error."""
+    
+    # Check name
+    if "name" not in indicator:
+        yield _MISSING_NAME
+        return
+    
+    name = indicator["name"].lower()
+    if name not in _VALID_INDICATOR_NAMES:
+        yield ERROR, f"Unknown indicator '{name}'. Valid indicators: {_VALID_INDICATOR_NAMES_STR}"
+        return
+    
+    # Check timeframe
+    if "timeframe" not in indicator:
+        yield WARNING, f"'{name}' missing 'timeframe' - defaulting to 'daily'"
+    elif not isinstance(indicator["timeframe"], str) or indicator["timeframe"] not in VALID_TIMEFRAMES:
+        yield ERROR, f"Invalid timeframe '{indicator['timeframe']}'. Valid: {_VALID_TIMEFRAMES_STR}"
+        return
+    
+    # Check offset
+    if "offset" in indicator:
+        if not isinstance(indicator["offset"], int) or indicator["offset"] < 0:
+            yield _BAD_OFFSET
+            return
+    
+    # Check params/period for indicators that require it
+    if name in _REQUIRES_PERIOD:
+        params = indicator.get("params", {})
+        if "period" not in params:
+            yield WARNING, f"'{name}' missing 'period' - defaulting to {_DEFAULT_PERIOD[name]}"
+        elif not isinstance(params["period"], int) or params["period"] < 1:
+            yield ERROR, f"'{name}' period must be a positive integer"
+            return
+    
+    # RHS-only fields validation
+    if side == "rhs":
+        if "multiplier" in indicator:
+            if not isinstance(indicator["multiplier"], (int, float)):
+                yield ERROR, "'multiplier' must be a number"
+                return
+        if "add_offset" in indicator:
+            if not isinstance(indicator["add_offset"], (int, float)):
+                yield ERROR, "'add_offset' must be a number"
+                return
+    elif side == "lhs":
+        if "multiplier" in indicator:
+            yield WARNING, "'multiplier' on LHS will be ignored - only valid for RHS"
+        if "add_offset" in indicator:
+            yield WARNING, "'add_offset' on LHS will be ignored - only valid for RHS"
+
+
+def _iter_value_problems(operand: Dict, side: str) -> Iterator[Problem]:
+    """Yield problems for a constant value operand."""
+    if "value" not in operand:
+        yield _MISSING_VALUE
+    elif not isinstance(operand["value"], (int, float)):
+        yield _BAD_VALUE
+
+
+def _iter_invalid_type_problems(operand: Dict, side: str) -> Iterator[Problem]:
+    """Yield the error for an operand whose 'type' is not recognised."""
+    yield ERROR, f"Invalid type '{operand['type']}'. Must be 'indicator' or 'value'"
+
+
+# Operand 'type' -> problem generator
+_OPERAND_VALIDATORS: Dict[str, Callable[[Dict, str], Iterator[Problem]]] = {
+    "value": _iter_value_problems,
+    "indicator": _iter_indicator_problems,
+}
+
+
+def _iter_operand_problems(operand: Dict, side: str) -> Iterator[Problem]:
+    """Yield problems for an operand (LHS or RHS), stopping after the first error."""
+    
+    if not isinstance(operand, dict):
+        yield _BAD_TYPE
+        return
+    
+    if "type" not in operand:
+        yield _MISSING_TYPE
+        return
+    
+    op_type = operand["type"]
+    if not isinstance(op_type, str):
+        op_type = None
+    yield from _OPERAND_VALIDATORS.get(op_type, _iter_invalid_type_problems)(operand, side)
+
+
+def _iter_condition_problems(condition: Dict, index: int = 0) -> Iterator[Problem]:
+    """Yield problems for a single condition, stopping after the first error."""
+    
+    if not isinstance(condition, dict):
+        yield ERROR, "Condition must be an object"
+        return
+    
+    # Check required fields
+    if "lhs" not in condition:
+        yield ERROR, "Missing 'lhs' (left-hand side)"
+        return
+    if "operator" not in condition:
+        yield ERROR, "Missing 'operator'"
+        return
+    if "rhs" not in condition:
+        yield ERROR, "Missing 'rhs' (right-hand side)"
+        return
+    
+    # Validate operator
+    if not isinstance(condition["operator"], str) or condition["operator"] not in VALID_OPERATORS:
+        yield ERROR, f"Invalid operator '{condition['operator']}'. Valid: {_VALID_OPERATORS_STR}"
+        return
+    
+    # Validate tolerance for approximate operator
+    if condition["operator"] == "≈ (approx)":
+        if "tolerance" not in condition:
+            yield WARNING, f"Condition {index+1}: '≈ (approx)' operator without 'tolerance' - defaulting to 1%"
+    
+    # Validate LHS (must be indicator), then RHS (can be indicator or value)
+    for side, label in (("lhs", "LHS"), ("rhs", "RHS")):
+        for severity, message in _iter_operand_problems(condition[side], side):
+            if severity == ERROR:
+                yield ERROR, f"{label} error: {message}"
+                return
+            yield severity, message
+
+
+def _iter_problems(strategy: Dict, check_condition: Callable[[Dict, int], Iterable[Problem]] = _iter_condition_problems) -> Iterator[Problem]:
+    """
+    Yield every (severity, message) problem found in a strategy.
+    
+    Args:
+        strategy: The strategy to validate
+        check_condition: Produces the problems of one condition (overridable to reuse earlier results)
+    """
+    # Check required fields
+    if not isinstance(strategy, dict):
+        yield ERROR, "Strategy must be a JSON object"
+        return
+    
+    # Validate name
+    if "name" not in strategy:
+        yield ERROR, "Missing required field: 'name'"
+    elif not isinstance(strategy["name"], str) or not strategy["name"].strip():
+        yield ERROR, "'name' must be a non-empty string"
+    
+    # Validate description (optional but recommended)
+    if "description" not in strategy:
+        yield WARNING, "Missing 'description' field - recommended for clarity"
+    
+    # Validate conditions
+    if "conditions" not in strategy:
+        yield ERROR, "Missing required field: 'conditions'"
+    elif not isinstance(strategy["conditions"], list):
+        yield ERROR, "'conditions' must be an array"
+    elif len(strategy["conditions"]) == 0:
+        yield ERROR, "'conditions' array cannot be empty"
+    else:
+        for i, condition in enumerate(strategy["conditions"]):
+            for severity, message in check_condition(condition, i):
+                if severity == ERROR:
+                    yield ERROR, f"Condition {i+1}: {message}"
+                else:
+                    yield severity, message
+
+
+def _iter_is_valid(strategy: Dict) -> bool:
+    """Generic validity check, stopping at the first error without collecting messages."""
+    return not any(severity == ERROR for severity, _ in _iter_problems(strategy))
+
+
+def _shape_key(strategy: Dict) -> Tuple:
+    """
+    Describe the parts of a strategy that a compiled validator is specialised on.
+    Raises (KeyError/TypeError/AttributeError) for strategies too malformed to have a shape.
+    """
+    return tuple(
+        (c["lhs"].get("type"), c["lhs"].get("name"), c["operator"], c["rhs"].get("type"))
+        for c in strategy["conditions"]
+    )
+
+
+def _emit_operand_checks(lines: List[str], var: str, side: str, op_type: Any, name: Any) -> bool:
+    """
+    Append straight-line checks for one operand to lines.
+    name is the compile-time indicator name, or None to check the name at runtime.
+    Returns False if the operand can never be valid.
+    """
+    lines.append(f"    if not isinstance({var}, dict): return False")
+    
+    if op_type == "value":
+        lines.append(f"    if 'value' not in {var} or not isinstance({var}['value'], (int, float)): return False")
+        return True
+    if op_type != "indicator":
+        return False
+    
+    if name is None:
+        lines.append(f"    nm = {var}.get('name')")
+        lines.append("    if not isinstance(nm, str): return False")
+        lines.append("    nm = nm.lower()")
+        lines.append("    if nm not in _IND: return False")
+    elif not isinstance(name, str) or name.lower() not in _VALID_INDICATOR_NAMES:
+        return False
+    
+    lines.append(f"    if 'timeframe' in {var} and (not isinstance({var}['timeframe'], str) or {var}['timeframe'] not in _TF): return False")
+    lines.append(f"    if 'offset' in {var} and (not isinstance({var}['offset'], int) or {var}['offset'] < 0): return False")
+    
+    if name is None:
+        lines.append("    if nm in _REQ:")
+        lines.append(f"        p = {var}.get('params', {{}})")
+        lines.append("        if 'period' in p and (not isinstance(p['period'], int) or p['period'] < 1): return False")
+    elif name.lower() in _REQUIRES_PERIOD:
+        lines.append(f"    p = {var}.get('params', {{}})")
+        lines.append("    if 'period' in p and (not isinstance(p['period'], int) or p['period'] < 1): return False")
+    
+    if side == "rhs":
+        lines.append(f"    if 'multiplier' in {var} and not isinstance({var}['multiplier'], (int, float)): return False")
+        lines.append(f"    if 'add_offset' in {var} and not isinstance({var}['add_offset'], (int, float)): return False")
+    return True
+
+
+@lru_cache(maxsize=256)
+def _compile_validator(shape_key: Tuple) -> Callable[[Dict], bool]:
+    """
+    Generate and compile a straight-line boolean validator for strategies of one shape.
+    Everything fixed by the shape (condition count, operators, LHS names, operand types)
+    is decided here once; only the remaining fields are checked per call.
+    """
+    lines = [
+        "def validate(s):",
+        "    if not isinstance(s, dict): return False",
+        "    n = s.get('name')",
+        "    if not isinstance(n, str) or not n.strip(): return False",
+        "    c = s['conditions']",
+        f"    if not isinstance(c, list) or len(c) != {len(shape_key)}: return False",
+    ]
+    possible = len(shape_key) > 0
+    
+    for i, (lhs_type, lhs_name, operator, rhs_type) in enumerate(shape_key):
+        if not isinstance(operator, str) or operator not in VALID_OPERATORS:
+            possible = False
+            break
+        lines.append(f"    ci = c[{i}]")
+        lines.append("    if not isinstance(ci, dict): return False")
+        lines.append("    lhs = ci['lhs']; rhs = ci['rhs']")
+        if not (_emit_operand_checks(lines, "lhs", "lhs", lhs_type, lhs_name)
+                and _emit_operand_checks(lines, "rhs", "rhs", rhs_type, None)):
+            possible = False
+            break
+    
+    if not possible:
+        return lambda s: False
+    
+    lines.append("    return True")
+    namespace = {"_IND": _VALID_INDICATOR_NAMES, "_REQ": _REQUIRES_PERIOD, "_TF": VALID_TIMEFRAMES}
+    exec(compile("\n".join(lines), "<compiled strategy validator>", "exec"), namespace)
+    return namespace["validate"]
+
+
+def fast_is_valid(strategy: Dict) -> bool:
+    """
+    Return whether a strategy is valid, without collecting messages.
+    Uses a validator compiled once per strategy shape; strategies too malformed to have a
+    shape fall back to the generic check.
+    """
+    try:
+        validator = _compile_validator(_shape_key(strategy))
+    except (KeyError, TypeError, AttributeError):
+        return _iter_is_valid(strategy)
+    return validator(strategy)
+
+
+def _sanitize_value_operand(operand: Dict, side: str) -> Dict:
+    """Sanitize a constant value operand."""
+    value = operand.get("value", 0)
+    if not isinstance(value, (int, float)):
+        try:
+            value = float(value)
+        except (ValueError, TypeError):
+            value = 0
+    return {"type": "value", "value": value}
+
+
+def _sanitize_indicator_operand(operand: Dict, side: str) -> Dict:
+    """Sanitize an indicator operand."""
+    # Already-canonical names (the common case) skip the str()/lower() fold
+    name_raw = operand.get("name", "close")
+    name = _CANONICAL_INDICATOR_NAMES.get(name_raw) if isinstance(name_raw, str) else None
+    if name is None:
+        name = _CANONICAL_INDICATOR_NAMES.get(str(name_raw).lower(), "close")
+    
+    sanitized = {
+        "type": "indicator",
+        "name": name,
+        "timeframe": operand.get("timeframe", "daily"),
+        "offset": max(0, int(operand.get("offset", 0)))
+    }
+    
+    # Fix timeframe
+    if not isinstance(sanitized["timeframe"], str) or sanitized["timeframe"] not in VALID_TIMEFRAMES:
+        sanitized["timeframe"] = "daily"
+    else:
+        sanitized["timeframe"] = sys.intern(sanitized["timeframe"])
+    
+    # Handle params
+    if name in _REQUIRES_PERIOD:
+        default_period = _DEFAULT_PERIOD[name]
+        params = operand.get("params", {})
+        period = params.get("period", default_period)
+        if not isinstance(period, int) or period < 1:
+            period = default_period
+        sanitized["params"] = {"period": period}
+    else:
+        sanitized["params"] = {}
+    
+    # RHS-only fields
+    if side == "rhs":
+        if "multiplier" in operand:
+            sanitized["multiplier"] = float(operand.get("multiplier", 1.0))
+        if "add_offset" in operand:
+            sanitized["add_offset"] = float(operand.get("add_offset", 0.0))
+    
+    return sanitized
+
+
+# Operand 'type' -> sanitizer
+_OPERAND_SANITIZERS: Dict[str, Callable[[Dict, str], Dict]] = {
+    "value": _sanitize_value_operand,
+    "indicator": _sanitize_indicator_operand,
 }
 
-VALID_OPERATORS = [">", "<", ">=", "<=", "==", "≈ (approx)"]
-VALID_TIMEFRAMES = ["daily", "weekly", "monthly"]
+
+_STRATEGY_KEYS = frozenset(("name", "description", "conditions"))
+_CONDITION_KEYS = frozenset(("lhs", "operator", "rhs"))
+_APPROX_CONDITION_KEYS = _CONDITION_KEYS | {"tolerance"}
+_VALUE_KEYS = frozenset(("type", "value"))
+_INDICATOR_KEYS = frozenset(("type", "name", "timeframe", "offset", "params"))
+_RHS_EXTRA_KEYS = frozenset(("multiplier", "add_offset"))
+
+
+def _operand_needs_sanitize(operand: Dict, side: str) -> bool:
+    """Whether sanitizing a valid operand would change it."""
+    if operand["type"] == "value":
+        return operand.keys() != _VALUE_KEYS
+    
+    keys = operand.keys()
+    if side == "rhs":
+        if not _INDICATOR_KEYS <= keys or not keys - _INDICATOR_KEYS <= _RHS_EXTRA_KEYS:
+            return True
+        if any(type(operand[k]) is not float for k in keys & _RHS_EXTRA_KEYS):
+            return True
+    elif keys != _INDICATOR_KEYS:
+        return True
+    
+    name = operand["name"]
+    if name != name.lower() or type(operand["offset"]) is not int:
+        return True
+    params = operand["params"]
+    if name in _REQUIRES_PERIOD:
+        return not (isinstance(params, dict) and params.keys() == {"period"})
+    return params != {}
+
+
+def _needs_sanitize(strategy: Dict) -> bool:
+    """
+    Quick single-pass probe: whether sanitize_strategy would change a strategy that
+    already passed validation (missing defaults, extra keys, non-canonical values).
+    """
+    if strategy.keys() != _STRATEGY_KEYS or strategy["name"] != strategy["name"].strip():
+        return True
+    
+    for condition in strategy["conditions"]:
+        expected = _APPROX_CONDITION_KEYS if condition["operator"] == "≈ (approx)" else _CONDITION_KEYS
+        if condition.keys() != expected:
+            return True
+        if _operand_needs_sanitize(condition["lhs"], "lhs") or _operand_needs_sanitize(condition["rhs"], "rhs"):
+            return True
+    return False
 
 
 class StrategyValidator:
@@ -51,181 +476,100 @@ class StrategyValidator:
     def __init__(self):
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        # Per-condition problems from the last validate_strategy call
+        self._condition_results: List[List[Problem]] = []
     
-    def validate_strategy(self, strategy: Dict) -> Tuple[bool, List[str], List[str]]:
+    def validate_strategy(self, strategy: Dict, only: Optional[Iterable[int]] = None) -> Tuple[bool, List[str], List[str]]:
         """
         Validate a complete strategy object.
         
+        Args:
+            strategy: The strategy to validate
+            only: If given, only re-check the conditions at these indices and reuse the
+                results of the previous call for the rest (e.g. the indices returned by
+                sanitize_strategy for the strategy that was just validated). Conditions
+                that previously had errors are always re-checked.
+        
         Returns:
             Tuple of (is_valid, errors, warnings)
         """
+        previous = self._condition_results
+        self._condition_results = []
+        recheck = None if only is None else set(only)
+        
+        def check_condition(condition: Dict, index: int) -> List[Problem]:
+            # Sanitizing can fix a condition without changing it under dict equality
+            # (e.g. offset 1.0 -> 1), so only error-free results are reused
+            if (recheck is not None and index not in recheck and index < len(previous)
+                    and all(severity != ERROR for severity, _ in previous[index])):
+                problems = previous[index]
+            else:
+                problems = list(_iter_condition_problems(condition, index))
+            self._condition_results.append(problems)
+            return problems
+        
         self.errors = []
         self.warnings = []
-        
-        # Check required fields
-        if not isinstance(strategy, dict):
-            self.errors.append("Strategy must be a JSON object")
-            return False, self.errors, self.warnings
-        
-        # Validate name
-        if "name" not in strategy:
-            self.errors.append("Missing required field: 'name'")
-        elif not isinstance(strategy["name"], str) or not strategy["name"].strip():
-            self.errors.append("'name' must be a non-empty string")
-        
-        # Validate description (optional but recommended)
-        if "description" not in strategy:
-            self.warnings.append("Missing 'description' field - recommended for clarity")
-        
-        # Validate conditions
-        if "conditions" not in strategy:
-            self.errors.append("Missing required field: 'conditions'")
-        elif not isinstance(strategy["conditions"], list):
-            self.errors.append("'conditions' must be an array")
-        elif len(strategy["conditions"]) == 0:
-            self.errors.append("'conditions' array cannot be empty")
-        else:
-            for i, condition in enumerate(strategy["conditions"]):
-                cond_valid, cond_error = self.validate_condition(condition, i)
-                if not cond_valid:
-                    self.errors.append(f"Condition {i+1}: {cond_error}")
+        for severity, message in _iter_problems(strategy, check_condition):
+            (self.errors if severity == ERROR else self.warnings).append(message)
         
         is_valid = len(self.errors) == 0
         return is_valid, self.errors, self.warnings
     
+    def _collect(self, problems: Iterable[Problem]) -> Tuple[bool, str]:
+        """Record warnings on self and return (is_valid, first_error)."""
+        for severity, message in problems:
+            if severity == ERROR:
+                return False, message
+            self.warnings.append(message)
+        return _OK
+    
     def validate_condition(self, condition: Dict, index: int = 0) -> Tuple[bool, str]:
         """Validate a single condition object."""
-        
-        if not isinstance(condition, dict):
-            return False, "Condition must be an object"
-        
-        # Check required fields
-        if "lhs" not in condition:
-            return False, "Missing 'lhs' (left-hand side)"
-        if "operator" not in condition:
-            return False, "Missing 'operator'"
-        if "rhs" not in condition:
-            return False, "Missing 'rhs' (right-hand side)"
-        
-        # Validate operator
-        if condition["operator"] not in VALID_OPERATORS:
-            return False, f"Invalid operator '{condition['operator']}'. Valid: {VALID_OPERATORS}"
-        
-        # Validate tolerance for approximate operator
-        if condition["operator"] == "≈ (approx)":
-            if "tolerance" not in condition:
-                self.warnings.append(f"Condition {index+1}: '≈ (approx)' operator without 'tolerance' - defaulting to 1%")
-        
-        # Validate LHS (must be indicator)
-        lhs_valid, lhs_error = self.validate_operand(condition["lhs"], "lhs")
-        if not lhs_valid:
-            return False, f"LHS error: {lhs_error}"
-        
-        # Validate RHS (can be indicator or value)
-        rhs_valid, rhs_error = self.validate_operand(condition["rhs"], "rhs")
-        if not rhs_valid:
-            return False, f"RHS error: {rhs_error}"
-        
-        return True, ""
+        return self._collect(_iter_condition_problems(condition, index))
     
     def validate_operand(self, operand: Dict, side: str) -> Tuple[bool, str]:
         """Validate an operand (LHS or RHS)."""
-        
-        if not isinstance(operand, dict):
-            return False, "Operand must be an object"
-        
-        if "type" not in operand:
-            return False, "Missing 'type' field"
-        
-        op_type = operand["type"]
-        
-        if op_type == "value":
-            if "value" not in operand:
-                return False, "Value type missing 'value' field"
-            if not isinstance(operand["value"], (int, float)):
-                return False, "'value' must be a number"
-            return True, ""
-        
-        elif op_type == "indicator":
-            return self.validate_indicator(operand, side)
-        
-        else:
-            return False, f"Invalid type '{op_type}'. Must be 'indicator' or 'value'"
+        return self._collect(_iter_operand_problems(operand, side))
     
     def validate_indicator(self, indicator: Dict, side: str) -> Tuple[bool, str]:
         """Validate an indicator operand."""
-        
-        # Check name
-        if "name" not in indicator:
-            return False, "Missing 'name' field"
-        
-        name = indicator["name"].lower()
-        if name not in VALID_INDICATORS:
-            return False, f"Unknown indicator '{name}'. Valid indicators: {list(VALID_INDICATORS.keys())}"
-        
-        # Check timeframe
-        if "timeframe" not in indicator:
-            self.warnings.append(f"'{name}' missing 'timeframe' - defaulting to 'daily'")
-        elif indicator["timeframe"] not in VALID_TIMEFRAMES:
-            return False, f"Invalid timeframe '{indicator['timeframe']}'. Valid: {VALID_TIMEFRAMES}"
-        
-        # Check offset
-        if "offset" in indicator:
-            if not isinstance(indicator["offset"], int) or indicator["offset"] < 0:
-                return False, "'offset' must be a non-negative integer"
-        
-        # Check params/period for indicators that require it
-        ind_config = VALID_INDICATORS[name]
-        if ind_config["requires_period"]:
-            params = indicator.get("params", {})
-            if "period" not in params:
-                self.warnings.append(f"'{name}' missing 'period' - defaulting to {ind_config['default_period']}")
-            elif not isinstance(params["period"], int) or params["period"] < 1:
-                return False, f"'{name}' period must be a positive integer"
-        
-        # RHS-only fields validation
-        if side == "rhs":
-            if "multiplier" in indicator:
-                if not isinstance(indicator["multiplier"], (int, float)):
-                    return False, "'multiplier' must be a number"
-            if "add_offset" in indicator:
-                if not isinstance(indicator["add_offset"], (int, float)):
-                    return False, "'add_offset' must be a number"
-        elif side == "lhs":
-            if "multiplier" in indicator:
-                self.warnings.append("'multiplier' on LHS will be ignored - only valid for RHS")
-            if "add_offset" in indicator:
-                self.warnings.append("'add_offset' on LHS will be ignored - only valid for RHS")
-        
-        return True, ""
+        return self._collect(_iter_indicator_problems(indicator, side))
     
-    def sanitize_strategy(self, strategy: Dict) -> Dict:
+    def sanitize_strategy(self, strategy: Dict) -> Tuple[Dict, Set[int]]:
         """
         Sanitize and fix common issues in a strategy.
-        Returns a corrected copy of the strategy.
+        
+        Returns:
+            Tuple of (corrected copy of the strategy, indices of conditions that were
+            changed or moved and therefore need to be validated again)
         """
         if not isinstance(strategy, dict):
-            return {"name": "Invalid Strategy", "description": "", "conditions": []}
+            return {"name": "Invalid Strategy", "description": "", "conditions": []}, set()
         
         sanitized = {
             "name": strategy.get("name", "Unnamed Strategy").strip(),
             "description": strategy.get("description", ""),
             "conditions": []
         }
+        changed: Set[int] = set()
         
         conditions = strategy.get("conditions", [])
         if not isinstance(conditions, list):
             conditions = []
         
-        for condition in conditions:
+        for i, condition in enumerate(conditions):
             if not isinstance(condition, dict):
                 continue
             
             sanitized_condition = self._sanitize_condition(condition)
             if sanitized_condition:
+                index = len(sanitized["conditions"])
+                if index != i or sanitized_condition != condition:
+                    changed.add(index)
                 sanitized["conditions"].append(sanitized_condition)
         
-        return sanitized
+        return sanitized, changed
     
     def _sanitize_condition(self, condition: Dict) -> Optional[Dict]:
         """Sanitize a single condition."""
@@ -242,8 +586,10 @@ class StrategyValidator:
             return None
         
         # Fix operator if invalid
-        if sanitized["operator"] not in VALID_OPERATORS:
+        if not isinstance(sanitized["operator"], str) or sanitized["operator"] not in VALID_OPERATORS:
             sanitized["operator"] = ">"
+        else:
+            sanitized["operator"] = sys.intern(sanitized["operator"])
         
         # Add tolerance for approx operator
         if sanitized["operator"] == "≈ (approx)":
@@ -257,53 +603,11 @@ class StrategyValidator:
             return None
         
         op_type = operand.get("type", "indicator")
+        if not isinstance(op_type, str):
+            return None
         
-        if op_type == "value":
-            value = operand.get("value", 0)
-            if not isinstance(value, (int, float)):
-                try:
-                    value = float(value)
-                except (ValueError, TypeError):
-                    value = 0
-            return {"type": "value", "value": value}
-        
-        elif op_type == "indicator":
-            name = str(operand.get("name", "close")).lower()
-            if name not in VALID_INDICATORS:
-                name = "close"
-            
-            sanitized = {
-                "type": "indicator",
-                "name": name,
-                "timeframe": operand.get("timeframe", "daily"),
-                "offset": max(0, int(operand.get("offset", 0)))
-            }
-            
-            # Fix timeframe
-            if sanitized["timeframe"] not in VALID_TIMEFRAMES:
-                sanitized["timeframe"] = "daily"
-            
-            # Handle params
-            ind_config = VALID_INDICATORS[name]
-            if ind_config["requires_period"]:
-                params = operand.get("params", {})
-                period = params.get("period", ind_config["default_period"])
-                if not isinstance(period, int) or period < 1:
-                    period = ind_config["default_period"]
-                sanitized["params"] = {"period": period}
-            else:
-                sanitized["params"] = {}
-            
-            # RHS-only fields
-            if side == "rhs":
-                if "multiplier" in operand:
-                    sanitized["multiplier"] = float(operand.get("multiplier", 1.0))
-                if "add_offset" in operand:
-                    sanitized["add_offset"] = float(operand.get("add_offset", 0.0))
-            
-            return sanitized
-        
-        return None
+        sanitizer = _OPERAND_SANITIZERS.get(op_type)
+        return sanitizer(operand, side) if sanitizer else None
     
     def suggest_fixes(self, errors: List[str]) -> List[str]:
         """Generate fix suggestions for common errors."""
@@ -315,47 +619,110 @@ class StrategyValidator:
             elif "Missing required field: 'conditions'" in error:
                 suggestions.append("Add a 'conditions' array with at least one condition")
             elif "Unknown indicator" in error:
-                suggestions.append(f"Valid indicators: {list(VALID_INDICATORS.keys())}")
+                suggestions.append(f"Valid indicators: {_VALID_INDICATOR_NAMES_STR}")
             elif "Invalid operator" in error:
-                suggestions.append(f"Valid operators: {VALID_OPERATORS}")
+                suggestions.append(f"Valid operators: {_VALID_OPERATORS_STR}")
             elif "Invalid timeframe" in error:
-                suggestions.append(f"Valid timeframes: {VALID_TIMEFRAMES}")
+                suggestions.append(f"Valid timeframes: {_VALID_TIMEFRAMES_STR}")
             elif "period must be" in error:
                 suggestions.append("Period should be a positive integer like 14, 20, 50, etc.")
         
         return suggestions
 
 
-def validate_json_string(json_str: str) -> Tuple[bool, Optional[Dict], str]:
+@lru_cache(maxsize=512)
+def _validate_json_cached(json_str: str) -> Tuple[bool, Optional[Any], str]:
     """
-    Parse and validate a JSON string as a strategy.
-    
-    Returns:
-        Tuple of (is_valid, parsed_dict_or_none, error_message)
+    Cached core of validate_json_string.
+    The sanitized strategy is stored serialized (bytes with orjson, str with json) so
+    cached results can't be mutated by callers.
     """
     try:
         # Try to parse JSON
-        strategy = json.loads(json_str)
+        strategy = _loads(json_str)
         
-        # Validate
+        # Validate; messages are only needed when the strategy is invalid
         validator = StrategyValidator()
-        is_valid, errors, warnings = validator.validate_strategy(strategy)
+        if fast_is_valid(strategy):
+            is_valid, errors = True, []
+        else:
+            is_valid, errors, _ = validator.validate_strategy(strategy)
         
         if is_valid:
-            # Sanitize for safety
-            sanitized = validator.sanitize_strategy(strategy)
-            return True, sanitized, ""
+            # Sanitize for safety, unless the strategy is already in canonical form
+            if _needs_sanitize(strategy):
+                strategy, _ = validator.sanitize_strategy(strategy)
+            return True, _dumps(strategy), ""
         else:
             error_msg = "; ".join(errors)
             return False, None, error_msg
             
-    except json.JSONDecodeError as e:
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
         return False, None, f"Invalid JSON: {str(e)}"
     except Exception as e:
         return False, None, f"Validation error: {str(e)}"
 
 
-# For testing
+def validate_json_string(json_str: str) -> Tuple[bool, Optional[Dict], str]:
+    """
+    Parse and validate a JSON string as a strategy.
+    Results are memoized on the raw string; each call still returns a fresh dict.
+    
+    Returns:
+        Tuple of (is_valid, parsed_dict_or_none, error_message)
+    """
+    is_valid, frozen, error_msg = _validate_json_cached(json_str)
+    return is_valid, _loads(frozen) if frozen is not None else None, error_msg
+
+
+def clear_validation_cache():
+    """Clear the memoized validate_json_string results."""
+    _validate_json_cached.cache_clear()
+
+
+def validate_many(strategies: List[Dict]) -> List[Tuple[bool, List[str], List[str]]]:
+    """
+    Validate a batch of already-parsed strategies without sanitizing them.
+    
+    Returns:
+        List of (is_valid, errors, warnings), one per strategy
+    """
+    out: List[Any] = [None] * len(strategies)
+    for i, strategy in enumerate(strategies):
+        errors: List[str] = []
+        warnings: List[str] = []
+        for severity, message in _iter_problems(strategy):
+            (errors if severity == ERROR else warnings).append(message)
+        out[i] = (not errors, errors, warnings)
+    return out
+
+
+def validate_many_json(json_strs: List[str]) -> List[Tuple[bool, Optional[Dict], str]]:
+    """
+    Batch version of validate_json_string sharing one validator (not memoized).
+    
+    Returns:
+        List of (is_valid, parsed_dict_or_none, error_message), one per string
+    """
+    out: List[Any] = [None] * len(json_strs)
+    validator = StrategyValidator()
+    for i, json_str in enumerate(json_strs):
+        try:
+            strategy = _loads(json_str)
+            errors = [] if fast_is_valid(strategy) else [
+                message for severity, message in _iter_problems(strategy) if severity == ERROR
+            ]
+            if errors:
+                out[i] = (False, None, "; ".join(errors))
+            else:
+                out[i] = (True, validator.sanitize_strategy(strategy)[0] if _needs_sanitize(strategy) else strategy, "")
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
+            out[i] = (False, None, f"Invalid JSON: {str(e)}")
+        except Exception as e:
+            out[i] = (False, None, f"Validation error: {str(e)}")
+    return out
+
+
 if __name__ == "__main__":
     test_strategy = {
         "name": "Test Strategy",
@@ -0,0 +1,156 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import ollama_client
+from ollama_client import OllamaClient, _split_document_sections
+
+
+def test_split_keeps_single_strategy_with_setext_underlines_whole():
+    document = "Momentum Breakout Strategy\n---\nEntry: RSI above 60\n---\nVolume filter: volume rising"
+    assert _split_document_sections(document) == [document]
+
+
+def test_split_keeps_headings_together():
+    document = "# Oversold bounce\nRSI below 30\n## Volume filter\nvolume above 20 day average"
+    assert _split_document_sections(document) == [document]
+
+
+def test_split_on_rules_between_strategies():
+    document = "# Oversold\nRSI below 30\n\n---\n\n# Trend\nclose above 200 day SMA"
+    assert _split_document_sections(document) == ["# Oversold\nRSI below 30", "# Trend\nclose above 200 day SMA"]
+
+
+def test_split_drops_sections_without_conditions():
+    document = "My strategies\n\n---\n\nRSI below 30\n\n---\n\nclose above SMA 50\n\n---\n\nNotes and disclaimers"
+    assert _split_document_sections(document) == ["RSI below 30", "close above SMA 50"]
+
+
+def test_split_single_condition_section_sends_whole_document():
+    document = "Title only\n\n---\n\nRSI below 30\n\n---\n\nNotes"
+    assert _split_document_sections(document) == [document]
+
+
+STRATEGY_JSON = (
+    '{"name": "Oversold", "description": "d", "conditions": [{"lhs": {"type": "indicator", "name": "rsi", '
+    '"params": {"period": 14}, "timeframe": "daily", "offset": 0}, "operator": "<", "rhs": {"type": "value", "value": 30}}]}'
+)
+
+
+def _client(monkeypatch):
+    """A client whose LLM calls are counted and whose embedder maps every prompt to the same vector."""
+    vector = np.ones(4, dtype=np.float32) / 2
+    monkeypatch.setattr(ollama_client, "_embed", lambda text: vector)
+    client = OllamaClient(use_disk_cache=False)
+    client.llm_calls = 0
+    
+    def generate(user_prompt):
+        client.llm_calls += 1
+        return True, STRATEGY_JSON, ""
+    
+    monkeypatch.setattr(client, "_generate_json_streamed", generate)
+    
+    def explain(strategy):
+        client.llm_calls += 1
+        return "explanation"
+    
+    monkeypatch.setattr(client, "_llm_explanation", explain)
+    return client
+
+
+def test_semantic_cache_hits_rewording_of_first_prompt(monkeypatch):
+    client = _client(monkeypatch)
+    assert client.parse_strategy_from_nl("RSI below 30")[0]
+    assert client.parse_strategy_from_nl("RSI under 30")[0]
+    assert client.llm_calls == 2
+
+
+def test_semantic_cache_requires_same_numbers_and_direction(monkeypatch):
+    client = _client(monkeypatch)
+    client.parse_strategy_from_nl("RSI below 30")
+    client.parse_strategy_from_nl("RSI below 35")
+    client.parse_strategy_from_nl("RSI above 30")
+    assert client.llm_calls == 6
+
+
+def test_semantic_cache_separates_auto_fix(monkeypatch):
+    client = _client(monkeypatch)
+    client.parse_strategy_from_nl("RSI below 30")
+    client.parse_strategy_from_nl("RSI below 30", auto_fix=False)
+    client.parse_strategy_from_nl("RSI under 30", auto_fix=False)
+    assert client.llm_calls == 4
+
+
+class _DictCache(dict):
+    """Stand-in for diskcache.Cache that counts writes."""
+    
+    writes = 0
+    
+    def set(self, key, value):
+        self.writes += 1
+        self[key] = value
+
+
+def _disk_client(monkeypatch, replies):
+    client = _client(monkeypatch)
+    client.cache = _DictCache()
+    client.cache_enabled = True
+    replies = iter(replies)
+    
+    def generate(user_prompt):
+        client.llm_calls += 1
+        return True, next(replies), ""
+    
+    monkeypatch.setattr(client, "_generate_json_streamed", generate)
+    return client
+
+
+def test_disk_cache_replays_reply_and_explanation(monkeypatch):
+    client = _disk_client(monkeypatch, [STRATEGY_JSON])
+    client.parse_strategy_from_nl("RSI below 30")
+    client._cache.clear()  # As after a restart
+    
+    success, _, explanation, _ = client.parse_strategy_from_nl("RSI below 30")
+    assert success and explanation == "explanation"
+    assert client.llm_calls == 2
+    assert client.cache.writes == 1
+
+
+def test_disk_cache_skips_invalid_replies(monkeypatch):
+    client = _disk_client(monkeypatch, ["Sorry, I can't help with that.", STRATEGY_JSON])
+    assert not client.parse_strategy_from_nl("RSI below 30")[0]
+    assert not client.cache
+    assert client.parse_strategy_from_nl("RSI below 30")[0]
+
+
+def test_truncated_stream_is_retried_with_larger_budget(monkeypatch):
+    client = OllamaClient(use_disk_cache=False)
+    budgets = []
+    
+    def iter_stream(payload, status=None):
+        budgets.append(payload["options"]["num_predict"])
+        if payload["options"]["num_predict"] < ollama_client.STRATEGY_RETRY_MAX_TOKENS:
+            status["done_reason"] = "length"
+            yield STRATEGY_JSON[:200]
+        else:
+            status["done_reason"] = "stop"
+            yield STRATEGY_JSON
+    
+    monkeypatch.setattr(client, "_iter_stream", iter_stream)
+    assert client._generate_json_streamed("RSI below 30") == (True, STRATEGY_JSON, "")
+    assert budgets == [ollama_client.STRATEGY_MAX_TOKENS, ollama_client.STRATEGY_RETRY_MAX_TOKENS]
+
+
+def test_truncated_stream_reports_cut_off(monkeypatch):
+    client = OllamaClient(use_disk_cache=False)
+    
+    def iter_stream(payload, status=None):
+        status["done_reason"] = "length"
+        yield STRATEGY_JSON[:200]
+    
+    monkeypatch.setattr(client, "_iter_stream", iter_stream)
+    success, _, error = client._generate_json_streamed("RSI below 30")
+    assert not success and "cut off" in error
@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy_validator import StrategyValidator
+
+
+def _strategy(lhs):
+    return {
+        "name": "Test Strategy",
+        "description": "A test",
+        "conditions": [
+            {"lhs": lhs, "operator": "<", "rhs": {"type": "value", "value": 30}}
+        ]
+    }
+
+
+def _validate_fixed(strategy):
+    """Validate, sanitize and incrementally re-validate the way OllamaClient does."""
+    validator = StrategyValidator()
+    is_valid, _, _ = validator.validate_strategy(strategy)
+    assert not is_valid
+    fixed, changed = validator.sanitize_strategy(strategy)
+    return validator.validate_strategy(fixed, only=changed)
+
+
+def test_sanitized_float_offset_revalidates():
+    lhs = {"type": "indicator", "name": "rsi", "params": {"period": 14}, "timeframe": "daily", "offset": 1.0}
+    assert _validate_fixed(_strategy(lhs)) == (True, [], [])
+
+
+def test_sanitized_float_period_revalidates():
+    lhs = {"type": "indicator", "name": "rsi", "params": {"period": 14.0}, "timeframe": "daily", "offset": 0}
+    assert _validate_fixed(_strategy(lhs)) == (True, [], [])
+
+
+def _random_operand(rng, side):
+    """A mostly-valid operand with occasional invalid fields."""
+    if rng.random() < 0.3:
+        return {"type": "value", "value": rng.choice([30, 2.5, 2.5, "x"])}
+    if rng.random() < 0.03:
+        return "not an operand"
+    operand = {
+        "type": rng.choice(["indicator"] * 9 + ["foo"]),
+        "name": rng.choice(["rsi", "sma", "close", "volume_sma", "RSI", "unknown"]),
+    }
+    if rng.random() < 0.8:
+        operand["timeframe"] = rng.choice(["daily", "weekly", "monthly", "hourly"])
+    if rng.random() < 0.7:
+        operand["params"] = {"period": rng.choice([14, 20, 50, 0, "x"])}
+    if rng.random() < 0.5:
+        operand["offset"] = rng.choice([0, 1, 5, -1])
+    if side == "rhs" and rng.random() < 0.4:
+        operand["multiplier"] = rng.choice([1.0, 1.5, "x"])
+    if rng.random() < 0.3:
+        operand["add_offset"] = rng.choice([0, 2.5, "x"])
+    return operand
+
+
+def test_fast_is_valid_matches_generic_validation():
+    from strategy_validator import _iter_is_valid, fast_is_valid
+    
+    rng = random.Random(7)
+    compared = valid = 0
+    for _ in range(5000):
+        strategy = {
+            "name": rng.choice(["Test"] * 9 + ["", " "]),
+            "conditions": [
+                {
+                    "lhs": _random_operand(rng, "lhs"),
+                    "operator": rng.choice([">", "<", ">=", "<=", "==", "≈ (approx)", "!="]),
+                    "rhs": _random_operand(rng, "rhs"),
+                }
+                for _ in range(rng.randint(0, 3))
+            ],
+        }
+        expected = _iter_is_valid(strategy)
+        assert fast_is_valid(strategy) == expected, strategy
+        compared += 1
+        valid += expected
+    # Make sure both outcomes were exercised
+    assert 100 < valid < compared